@@ -0,0 +1,86 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+#
+# C-level scan of a raw HTTP/1.1 request. Optional: app.main falls back to
+# its pure-Python scan_request when this module is not built.
+#
+# Build in place with: cythonize -i app/_http_parser.pyx
+
+from libc.string cimport memchr
+
+
+cdef Py_ssize_t _find_crlf(const char* buf, Py_ssize_t pos, Py_ssize_t end) noexcept nogil:
+    cdef const char* hit
+    while pos < end - 1:
+        hit = <const char*>memchr(buf + pos, b'\r', end - 1 - pos)
+        if hit == NULL:
+            return -1
+        pos = hit - buf
+        if buf[pos + 1] == b'\n':
+            return pos
+        pos += 1
+    return -1
+
+
+cdef Py_ssize_t _find_separator(const char* buf, Py_ssize_t pos, Py_ssize_t end) noexcept nogil:
+    # Position of the first b": " in buf[pos:end], or -1
+    cdef const char* hit
+    while pos < end - 1:
+        hit = <const char*>memchr(buf + pos, b':', end - 1 - pos)
+        if hit == NULL:
+            return -1
+        pos = hit - buf
+        if buf[pos + 1] == b' ':
+            return pos
+        pos += 1
+    return -1
+
+
+def scan_request(bytes request, dict header_names):
+    cdef const char* buf = request
+    cdef Py_ssize_t n = len(request)
+    cdef Py_ssize_t line_end, pos, first_space, second_space, sep
+    cdef const char* hit
+
+    line_end = _find_crlf(buf, 0, n)
+    if line_end == -1:
+        line_end = n
+
+    hit = <const char*>memchr(buf, b' ', line_end)
+    if hit == NULL:
+        raise ValueError("malformed request line")
+    first_space = hit - buf
+    hit = <const char*>memchr(hit + 1, b' ', line_end - first_space - 1)
+    if hit == NULL:
+        raise ValueError("malformed request line")
+    second_space = hit - buf
+
+    method = buf[:first_space]
+    path = buf[first_space + 1:second_space]
+    protocol = buf[second_space + 1:line_end]
+
+    headers = {}
+    pos = line_end + 2
+    while True:
+        line_end = _find_crlf(buf, pos, n)
+        if line_end == -1 or line_end == pos:
+            # An empty line indicates the end of the headers
+            break
+        sep = _find_separator(buf, pos, line_end)
+        if sep == -1:
+            key = buf[pos:line_end]
+            value = b""
+        else:
+            key = buf[pos:sep]
+            value = buf[sep + 2:line_end]
+        # Reuse the caller's shared object for well-known header names, which
+        # header_names keys in lowercase since names are case-insensitive
+        key = header_names.get(key.lower(), key)
+        # Repeated headers are combined into one comma-separated value
+        if key in headers:
+            headers[key] = headers[key] + b", " + value
+        else:
+            headers[key] = value
+        pos = line_end + 2
+
+    body = buf[line_end + 2:n] if line_end != -1 else b""
+    return method, path, protocol, headers, body
@@ -1,72 +1,113 @@
-import socket
-import threading
+import asyncio
 import argparse
+import logging
+import os
+import signal
+import socket
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, suppress
+from functools import lru_cache, partial
 from dataclasses import dataclass
-from typing import Optional, Union
-import gzip
+from typing import BinaryIO, Iterator, Optional
+import zlib
+
+logger = logging.getLogger(__name__)
 
-SERVER_ACCEPTED_ENCODINGS = ["gzip"]
+SERVER_ACCEPTED_ENCODINGS = frozenset({b"gzip"})
+# Header names are case-insensitive. Parsed names matching one of these
+# (in any case) are swapped for the shared object, so lookups keyed on the same
+# constants match by identity before falling back to comparing bytes
+HOST = b"Host"
+USER_AGENT = b"User-Agent"
+ACCEPT_ENCODING = b"Accept-Encoding"
+CONNECTION = b"Connection"
+CONTENT_LENGTH = b"Content-Length"
+CONTENT_TYPE = b"Content-Type"
+TRANSFER_ENCODING = b"Transfer-Encoding"
+COMMON_HEADER_NAMES = {
+    name.lower(): name
+    for name in (HOST, USER_AGENT, ACCEPT_ENCODING, CONNECTION, CONTENT_LENGTH, CONTENT_TYPE, TRANSFER_ENCODING)
+}
+# Fastest deflate level: response bodies are small, so ratio barely changes
+GZIP_COMPRESS_LEVEL = 1
+# Blocking file I/O runs on a fixed pool so the event loop never stalls on disk
+FILE_IO_WORKERS = (os.cpu_count() or 1) * 4
+# Larger reads hand the parser whole requests (or several pipelined ones) at once
+RECV_SIZE = 64 * 1024
+# Requests whose request line and headers exceed this are rejected
+MAX_HEADER_SIZE = 64 * 1024
+# Request bodies are buffered in memory, so larger ones are refused up front
+MAX_BODY_SIZE = 16 * 1024 * 1024
+# Files below this size are served from an in-process cache instead of sendfile
+SMALL_FILE_LIMIT = 64 * 1024
+# Files modified more recently than this bypass that cache, see handle_get_files
+RACY_MTIME_WINDOW_NS = 2 * 1_000_000_000
+# Pre-encoded status lines for every response this server sends
+STATUS_LINES = {
+    200: b"HTTP/1.1 200 OK\r\n",
+    201: b"HTTP/1.1 201 Created\r\n",
+    400: b"HTTP/1.1 400 Bad Request\r\n",
+    404: b"HTTP/1.1 404 Not Found\r\n",
+    413: b"HTTP/1.1 413 Content Too Large\r\n",
+}
 
-@dataclass
+@dataclass(slots=True)
 class HTTPRequest:
-    method: str
-    path: str
-    protocol: str
-    headers: dict[str, str]
-    body: str
+    method: bytes
+    path: bytes
+    protocol: bytes
+    headers: dict[bytes, bytes]
+    body: bytes
 
-@dataclass
+@dataclass(slots=True)
 class HTTPResponse:
     status_code: int
     protocol: str
-    headers: dict[str, str]
-    body: Union[str, bytes]
+    headers: dict[bytes, bytes]
+    body: bytes
     message: str
+    # Open file streamed after the headers with sendfile instead of `body`
+    body_file: Optional[BinaryIO] = None
 
-    def handle_compression(self, compression_method: str, body_bytes: bytes) -> bytes:
-        if compression_method == "gzip":
-            return gzip.compress(body_bytes)
+    def handle_compression(self, compression_method: bytes, body_bytes: bytes) -> bytes:
+        if compression_method == b"gzip":
+            # wbits=31 makes zlib emit the gzip header and trailer itself
+            return zlib.compress(body_bytes, level=GZIP_COMPRESS_LEVEL, wbits=31)
         return body_bytes
 
     def build_response(self) -> bytes:
-        response = f"{self.protocol} {self.status_code} {self.message}\r\n"
+        status_line = STATUS_LINES.get(self.status_code) if self.protocol == "HTTP/1.1" else None
+        if status_line is None:
+            status_line = f"{self.protocol} {self.status_code} {self.message}\r\n".encode("ascii")
 
         compression_method = None
 
-        if self.headers and "Content-Encoding" in self.headers:
-            compression_method = self.headers["Content-Encoding"]
+        if self.headers and b"Content-Encoding" in self.headers:
+            compression_method = self.headers[b"Content-Encoding"]
         
-        body_bytes = b""
-        if self.body:
-            if isinstance(self.body, (bytes, bytearray)):
-                body_bytes = bytes(self.body)
-            else:
-                body_bytes = self.body.encode("utf-8")
+        body_bytes = self.body
 
         if body_bytes and compression_method:
             body_bytes = self.handle_compression(
                 compression_method=compression_method,
                 body_bytes=body_bytes,
             )
-            self.headers["Content-Length"] = str(len(body_bytes))
+            self.headers[b"Content-Length"] = str(len(body_bytes)).encode()
 
-        if self.headers:
-            for key, value in self.headers.items():
-                response += f"{key}: {value}\r\n"
+        parts = [status_line]
+        for key, value in self.headers.items():
+            parts += (key, b": ", value, b"\r\n")
+        parts.append(b"\r\n")
+        parts.append(body_bytes)
 
-        response += "\r\n"
-        
-        response_bytes = response.encode("utf-8")
-
-        if body_bytes:
-            response_bytes += body_bytes
-
-        return response_bytes
+        return b"".join(parts)
     
 def generate_response_headers(
-        request_headers: Optional[dict[str, str]] = None,
-        additional_headers: Optional[dict[str, str]] = None,
-    ) -> dict[str, str]:
+        request_headers: Optional[dict[bytes, bytes]] = None,
+        additional_headers: Optional[dict[bytes, bytes]] = None,
+    ) -> dict[bytes, bytes]:
     headers = {}
 
     if not request_headers and not additional_headers:
@@ -78,31 +119,60 @@ def generate_response_headers(
     if not request_headers:
         return headers
     
-    for key, value in request_headers.items():
-        if key == "Accept-Encoding":
-            accepted_encodings = [encoding.strip() for encoding in request_headers["Accept-Encoding"].split(",")]
-            for encoding in accepted_encodings:
-                if encoding in SERVER_ACCEPTED_ENCODINGS:
-                    headers["Content-Encoding"] = encoding
-                    break
-        elif key == "Connection":
-            headers[key] = value
+    accept_encoding = request_headers.get(ACCEPT_ENCODING)
+    if accept_encoding:
+        for encoding in accept_encoding.split(b","):
+            encoding = encoding.strip()
+            if encoding in SERVER_ACCEPTED_ENCODINGS:
+                headers[b"Content-Encoding"] = encoding
+                break
+
+    connection = request_headers.get(CONNECTION)
+    if connection:
+        headers[b"Connection"] = connection
     
     return headers
 
-def extract_http_request_from_request(request: str) -> HTTPRequest:
-    method, path, protocol = extract_request_info_from_request(request)
-    headers = extract_headers_from_request(request)
-    body = extract_body_from_request(request)
-    return HTTPRequest(method, path, protocol, headers, body)
+try:
+    # Optional C build of the scanner: cythonize -i app/_http_parser.pyx
+    from ._http_parser import scan_request
+except ImportError:
+    def scan_request(
+        request: bytes, header_names: dict[bytes, bytes]
+    ) -> tuple[bytes, bytes, bytes, dict[bytes, bytes], bytes]:
+        # Single forward scan: the buffer is never split into a list of lines
+        line_end = request.find(b"\r\n")
+        if line_end == -1:
+            line_end = len(request)
+        method, path, protocol = request[:line_end].split(b" ", 2)
+
+        headers = {}
+        pos = line_end + 2
+        while True:
+            line_end = request.find(b"\r\n", pos)
+            if line_end == -1 or line_end == pos:
+                # An empty line indicates the end of the headers
+                break
+            key, _, value = request[pos:line_end].partition(b": ")
+            key = header_names.get(key.lower(), key)
+            # Repeated headers are combined into one comma-separated value
+            headers[key] = headers[key] + b", " + value if key in headers else value
+            pos = line_end + 2
+
+        body = request[line_end + 2:] if line_end != -1 else b""
+        return method, path, protocol, headers, body
+
+def parse_request(request: bytes) -> HTTPRequest:
+    return HTTPRequest(*scan_request(request, COMMON_HEADER_NAMES))
 
 def make_response(
     *,
     status_code: int,
     message: str,
-    headers: Optional[dict[str, str]] = None,
-    body: Union[str, bytes] = "",
+    headers: Optional[dict[bytes, bytes]] = None,
+    body: bytes = b"",
     protocol: str = "HTTP/1.1",
+    body_file: Optional[BinaryIO] = None,
 ) -> HTTPResponse:
     return HTTPResponse(
         status_code=status_code,
@@ -110,89 +180,122 @@ def make_response(
         headers=headers or {},
         body=body,
         message=message,
+        body_file=body_file,
     )
 
-def extract_request_info_from_request(request: str) -> tuple[str, str, str]:
-    request_info = request.split("\r\n")[0].split(" ")
-    method = request_info[0]
-    path = request_info[1]
-    protocol = request_info[2]
-    return method, path, protocol
-
-def extract_headers_from_request(request: str) -> dict[str, str]:
-    headers = {}
-    for line in request.split("\r\n")[1:]:
-        if line == "":
-            # An empty line indicates the end of the headers
-            break
-        key, value = line.split(": ", 1)
-        headers[key] = value
-    return headers
-
-def extract_body_from_request(request: str) -> str:
-    return request.split("\r\n\r\n", 1)[1] if "\r\n\r\n" in request else ""
-
 def handle_echo(http_request: HTTPRequest) -> HTTPResponse:
-    message = http_request.path[len("/echo/"):]
+    message = http_request.path[len(b"/echo/"):]
     return make_response(
         status_code=200,
         message="OK",
         headers=generate_response_headers(
             request_headers=http_request.headers,
             additional_headers={
-                "Content-Type": "text/plain",
-                "Content-Length": str(len(message)),
+                b"Content-Type": b"text/plain",
+                b"Content-Length": str(len(message)).encode(),
             }
         ),
         body=message,
     )
 
 def handle_user_agent(http_request: HTTPRequest) -> HTTPResponse:
-    user_agent_header = http_request.headers.get("User-Agent", "Unknown")
+    user_agent_header = http_request.headers.get(USER_AGENT, b"Unknown")
     return make_response(
         status_code=200,
         message="OK",
         headers=generate_response_headers(
             request_headers=http_request.headers,
             additional_headers={
-                "Content-Type": "text/plain",
-                "Content-Length": str(len(user_agent_header)),
+                b"Content-Type": b"text/plain",
+                b"Content-Length": str(len(user_agent_header)).encode(),
             }
         ),
         body=user_agent_header,
     )
 
-def handle_get_files(http_request: HTTPRequest, directory: str) -> HTTPResponse:
-    filename = http_request.path[len("/files/"):]
-    full_path = f"{directory}/{filename}"
+def read_file(full_path: bytes) -> bytes:
+    with open(full_path, "rb") as f:
+        return f.read()
+
+@lru_cache(maxsize=1024)
+def read_small_file(full_path: bytes, mtime_ns: int, size: int, inode: int) -> bytes:
+    # The stat fields are only part of the cache key. They change when a file is
+    # edited or replaced, except for a same-size rewrite of the same inode within
+    # one timestamp tick, which is why callers skip recently modified files
+    return read_file(full_path)
+
+def resolve_file_path(http_request: HTTPRequest, directory: bytes) -> Optional[bytes]:
+    # directory is already resolved and ends with a separator, see serve()
+    # Paths stay bytes so any filename, UTF-8 or not, maps straight to the disk
+    filename = http_request.path[len(b"/files/"):]
+    if b"\x00" in filename:
+        # No file can have a NUL in its name, and os.path would raise ValueError
+        return None
+    full_path = os.path.realpath(os.path.join(directory, filename))
+    return full_path if full_path.startswith(directory) else None
+
+def handle_get_files(http_request: HTTPRequest, directory: bytes) -> HTTPResponse:
+    full_path = resolve_file_path(http_request, directory)
+    if full_path is None:
+        return handle_not_found(http_request)
     try:
-        with open(full_path, "r") as f:
-            content = f.read()
+        st = os.stat(full_path)
+        if not stat.S_ISREG(st.st_mode):
+            return handle_not_found(http_request)
+        if st.st_size < SMALL_FILE_LIMIT:
+            if time.time_ns() - st.st_mtime_ns < RACY_MTIME_WINDOW_NS:
+                # "Racy clean": another write in this timestamp tick would keep
+                # the same cache key, so the file isn't cached until it settles
+                content = read_file(full_path)
+            else:
+                content = read_small_file(full_path, st.st_mtime_ns, st.st_size, st.st_ino)
+            f = None
+        else:
+            f = open(full_path, "rb")
+    except OSError:
+        # Missing, a path through a regular file, unreadable: all answer 404
+        return handle_not_found(http_request)
+
+    if f is None:
         return make_response(
             status_code=200,
             message="OK",
             headers=generate_response_headers(
                 request_headers=http_request.headers,
                 additional_headers={
-                    "Content-Type": "application/octet-stream",
-                    "Content-Length": str(len(content))
+                    b"Content-Type": b"application/octet-stream",
+                    b"Content-Length": str(len(content)).encode(),
                 }
             ),
             body=content,
         )
-    except FileNotFoundError:
-        return make_response(status_code=404, message="Not Found",headers=generate_response_headers(request_headers=http_request.headers))
-    
-def handle_post_files(http_request: HTTPRequest, directory: str) -> HTTPResponse:
-    filename = http_request.path[len("/files/"):]
-    full_path = f"{directory}/{filename}"
-    with open(full_path, "w") as f:
-        f.write(http_request.body)
+
+    headers = generate_response_headers(
+        request_headers=http_request.headers,
+        additional_headers={
+            b"Content-Type": b"application/octet-stream",
+            b"Content-Length": str(os.fstat(f.fileno()).st_size).encode(),
+        }
+    )
+    # The file goes out untouched via sendfile, so it can't be compressed
+    headers.pop(b"Content-Encoding", None)
+    return make_response(status_code=200, message="OK", headers=headers, body_file=f)
+
+def handle_post_files(http_request: HTTPRequest, directory: bytes) -> HTTPResponse:
+    full_path = resolve_file_path(http_request, directory)
+    if full_path is None:
+        return handle_not_found(http_request)
+    try:
+        with open(full_path, "wb") as f:
+            f.write(http_request.body)
+    except OSError:
+        # Missing parent directory, a directory in the way, no permission
+        return handle_not_found(http_request)
 
     return make_response(status_code=201, message="Created",headers=generate_response_headers(request_headers=http_request.headers))
 
-def handle_files(http_request: HTTPRequest, directory: str) -> HTTPResponse:
-    if http_request.method == "GET":
+def handle_files(http_request: HTTPRequest, directory: bytes) -> HTTPResponse:
+    if http_request.method == b"GET":
         return handle_get_files(http_request, directory)
     else:
         return handle_post_files(http_request, directory)
@@ -200,59 +303,269 @@ def handle_files(http_request: HTTPRequest, directory: str) -> HTTPResponse:
 def handle_root(http_request: HTTPRequest) -> HTTPResponse:
     return make_response(status_code=200, message="OK", headers=generate_response_headers(request_headers=http_request.headers))
 
-def handle_client(conn: socket.socket, addr, directory: str) -> None:
-    # wait for client
-    print(f"Connection from {addr}")
+def handle_not_found(http_request: HTTPRequest) -> HTTPResponse:
+    return make_response(status_code=404, message="Not Found", headers=generate_response_headers(request_headers=http_request.headers))
+
+def handle_bad_request() -> HTTPResponse:
+    # The request could not be framed, so nothing after it on the connection can be trusted
+    return make_response(status_code=400, message="Bad Request", headers={CONNECTION: b"close"})
+
+def handle_request_too_large() -> HTTPResponse:
+    # The body is never read, so the connection can't be reused either
+    return make_response(status_code=413, message="Content Too Large", headers={CONNECTION: b"close"})
+
+EXACT_ROUTES = {
+    b"/": handle_root,
+    b"/user-agent": handle_user_agent,
+}
+
+PREFIX_ROUTES = {
+    b"echo": handle_echo,
+    b"files": handle_files,
+}
+
+@contextmanager
+def corked(writer: asyncio.StreamWriter) -> Iterator[None]:
+    # Hold back partial segments so the headers go out with the first file bytes
+    sock = writer.get_extra_info("socket")
+    if not hasattr(socket, "TCP_CORK") or sock is None:
+        yield
+        return
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 1)
     try:
-        while True:
-            request = conn.recv(4096)
-            if not request:
-                break
-            request = request.decode("utf-8")
-            print(f"Received request: {request}")
-
-            http_request = extract_http_request_from_request(request)
-            print(
-                "\n".join(
-                    [
-                        f"Requested method: {http_request.method}",
-                        f"Requested path: {http_request.path}",
-                        f"Requested protocol: {http_request.protocol}",
-                        f"Requested headers: {http_request.headers}",
-                        f"Requested body: {http_request.body}",
-                    ]
-                )
-            )
+        yield
+    finally:
+        with suppress(OSError):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 0)
 
-            close_connection = http_request.headers.get("Connection", "").lower() == "close"
+class RequestTooLarge(ValueError):
+    pass
 
-            if http_request.path.startswith("/echo/"):
-                response = handle_echo(http_request)
-            elif http_request.path == "/user-agent":
-                response = handle_user_agent(http_request)
-            elif http_request.path.startswith("/files/"):
-                response = handle_files(http_request, directory)
-            elif http_request.path == "/":
-                response = handle_root(http_request)
-            else:
-                response = make_response(status_code=404, message="Not Found",headers=generate_response_headers(request_headers=http_request.headers))
+class RequestBuffer:
+    # Frames requests out of a connection's byte stream: headers, then
+    # Content-Length bytes of body. Reads are appended to one bytearray and
+    # consumed from its front, so buffering a large body stays linear. pop()
+    # raises ValueError when the stream can't be framed, after which it must
+    # not be read any further.
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        # Where the next search for the end of the headers resumes
+        self._scan_from = 0
+        # A request whose headers are parsed but whose body is still arriving
+        self._pending: Optional[HTTPRequest] = None
+        self._body_length = 0
+
+    def feed(self, data: bytes) -> None:
+        self._buffer += data
+
+    def pop(self) -> Optional[HTTPRequest]:
+        buffer = self._buffer
+        if self._pending is None:
+            headers_end = buffer.find(b"\r\n\r\n", self._scan_from)
+            if headers_end == -1:
+                if len(buffer) > MAX_HEADER_SIZE:
+                    raise ValueError("request headers too large")
+                # Resume just before the end: the terminator may straddle two reads
+                self._scan_from = max(0, len(buffer) - 3)
+                return None
+            if headers_end > MAX_HEADER_SIZE:
+                raise ValueError("request headers too large")
+
+            body_start = headers_end + 4
+            http_request = parse_request(bytes(buffer[:body_start]))
+            if TRANSFER_ENCODING in http_request.headers:
+                # Chunked bodies aren't supported; guessing a length would desync the stream
+                raise ValueError("Transfer-Encoding is not supported")
+            content_length = http_request.headers.get(CONTENT_LENGTH, b"0")
+            if b"," in content_length:
+                # Repeated Content-Length headers are only acceptable if they agree
+                lengths = {length.strip() for length in content_length.split(b",")}
+                if len(lengths) != 1:
+                    raise ValueError("conflicting Content-Length")
+                content_length = lengths.pop()
+            # Digits only: int() would also accept signs, whitespace and underscores
+            if not content_length.isdigit():
+                raise ValueError("invalid Content-Length")
+            self._body_length = int(content_length)
+            if self._body_length > MAX_BODY_SIZE:
+                raise RequestTooLarge("request body too large")
+            del buffer[:body_start]
+            self._scan_from = 0
+            self._pending = http_request
+
+        if len(buffer) < self._body_length:
+            return None
+        http_request, self._pending = self._pending, None
+        http_request.body = bytes(buffer[:self._body_length])
+        del buffer[:self._body_length]
+        return http_request
+
+async def respond(http_request: HTTPRequest, writer: asyncio.StreamWriter, directory: bytes) -> None:
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Received request from %s: method=%r path=%r protocol=%r headers=%r body=%r",
+            writer.get_extra_info("peername"),
+            http_request.method,
+            http_request.path,
+            http_request.protocol,
+            http_request.headers,
+            http_request.body,
+        )
 
-            conn.sendall(response.build_response())
+    handler = EXACT_ROUTES.get(http_request.path)
+    if handler is None:
+        # Prefix routes are keyed on the first path segment, e.g. b"echo"
+        segment, separator, _ = http_request.path[1:].partition(b"/")
+        handler = PREFIX_ROUTES.get(segment, handle_not_found) if separator else handle_not_found
 
-            if close_connection:
+    if handler is handle_files:
+        response = await asyncio.get_running_loop().run_in_executor(
+            None, handle_files, http_request, directory
+        )
+    else:
+        response = handler(http_request)
+
+    payload = response.build_response()
+    if response.body_file is None:
+        writer.write(payload)
+    else:
+        with response.body_file, corked(writer):
+            writer.write(payload)
+            await asyncio.get_running_loop().sendfile(writer.transport, response.body_file)
+    await writer.drain()
+
+async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, directory: bytes) -> None:
+    addr = writer.get_extra_info("peername")
+    logger.debug("Connection from %s", addr)
+    sock = writer.get_extra_info("socket")
+    if sock is not None:
+        # Small responses must not wait on Nagle; keep-alive peers get probed
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    requests = RequestBuffer()
+    try:
+        close_connection = False
+        while not close_connection:
+            data = await reader.read(RECV_SIZE)
+            if not data:
                 break
+            requests.feed(data)
+
+            # Serve every complete request already buffered before reading again
+            while not close_connection:
+                try:
+                    http_request = requests.pop()
+                except RequestTooLarge:
+                    logger.debug("Oversized request from %s", addr, exc_info=True)
+                    writer.write(handle_request_too_large().build_response())
+                    await writer.drain()
+                    close_connection = True
+                    break
+                except ValueError:
+                    logger.debug("Malformed request from %s", addr, exc_info=True)
+                    writer.write(handle_bad_request().build_response())
+                    await writer.drain()
+                    close_connection = True
+                    break
+                if http_request is None:
+                    break
+                await respond(http_request, writer, directory)
+                close_connection = http_request.headers.get(CONNECTION, b"").lower() == b"close"
     finally:
-        conn.close()
+        writer.close()
+        await writer.wait_closed()
 
-def main(directory: str) -> None:
-    with socket.create_server(("localhost", 4221), reuse_port=True) as server_socket:
-        while True:
-            conn, addr = server_socket.accept()
-            thread = threading.Thread(target=handle_client, args=(conn, addr, directory), daemon=True)
-            thread.start()
+async def serve(directory: str) -> None:
+    # Resolved once so every /files/ request can be checked with a prefix match
+    served_directory = os.path.join(os.path.realpath(os.fsencode(directory)), b"")
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=FILE_IO_WORKERS)
+    loop.set_default_executor(pool)
+
+    server = await asyncio.start_server(
+        partial(handle_client, directory=served_directory),
+        "localhost",
+        4221,
+        reuse_port=True,
+    )
+    for server_socket in server.sockets:
+        server_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def shutdown() -> None:
+        server.close()
+        # `async with server` waits for open connections, so drop idle keep-alive ones
+        server.close_clients()
+
+    loop.add_signal_handler(signal.SIGTERM, shutdown)
+    try:
+        async with server:
+            with suppress(asyncio.CancelledError):
+                await server.serve_forever()
+    finally:
+        pool.shutdown(wait=False)
+
+STOP_SIGNALS = {signal.SIGTERM, signal.SIGINT}
+
+def run_worker(directory: str) -> None:
+    # Runs in a forked child and never returns: os._exit skips the interpreter
+    # teardown and stdio buffers the child inherited from the parent
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+    status = 0
+    try:
+        asyncio.run(serve(directory))
+    except KeyboardInterrupt:
+        pass
+    except BaseException:
+        logger.exception("Worker %d failed", os.getpid())
+        status = 1
+    finally:
+        os._exit(status)
+
+def main(directory: str, workers: int = 1) -> None:
+    if workers <= 1:
+        asyncio.run(serve(directory))
+        return
+
+    # Pre-fork: every worker binds its own SO_REUSEPORT listener and the kernel
+    # spreads incoming connections across them, sidestepping the GIL
+    children = []
+    stopping = False
+
+    def stop_children(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            with suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    # Installed before forking so an early signal still reaches every child.
+    # Signals stay blocked across each fork until the pid is recorded.
+    signal.signal(signal.SIGTERM, stop_children)
+    signal.signal(signal.SIGINT, stop_children)
+    for _ in range(workers):
+        if stopping:
+            break
+        signal.pthread_sigmask(signal.SIG_BLOCK, STOP_SIGNALS)
+        pid = os.fork()
+        if pid == 0:
+            run_worker(directory)
+        children.append(pid)
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+
+    failed = False
+    for pid in children:
+        _, wait_status = os.waitpid(pid, 0)
+        failed = failed or os.waitstatus_to_exitcode(wait_status) != 0
+    if failed:
+        raise SystemExit(1)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="A simple HTTP server.")
     parser.add_argument("--directory", type=str, default=".", help="The directory to serve files from.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes to fork, e.g. the CPU count.")
+    parser.add_argument("--log-level", type=str, default="WARNING", help="Logging level, e.g. DEBUG to log every request.")
     args = parser.parse_args()
-    main(args.directory)
+    logging.basicConfig(level=args.log_level.upper())
+    main(args.directory, args.workers)